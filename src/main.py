@@ -1,8 +1,32 @@
 import itertools
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
 from dataclasses import dataclass
-from functools import reduce
+from functools import lru_cache, reduce
 from pathlib import Path
-from typing import Iterator, Self
+from typing import Iterable, Iterator, Self
+
+# the number of sequence lengths to keep a move table for
+MUTATION_TABLES = 32
+
+SEQUENCES_MAGIC = b"SWPS"
+OPERATIONS_MAGIC = b"SWPO"
+CHECKPOINT_MAGIC = b"SWPC"
+BINARY_VERSION = 1
+
+# magic, version, item size in bytes, record width, record count
+_SEQUENCES_HEADER = struct.Struct("<4sBBHI")
+# magic, version, item size in bytes, record count
+_OPERATIONS_HEADER = struct.Struct("<4sBBI")
+# magic, version, search, item size in bytes, sequence length, depth, position,
+# frontier count, expanded count
+_CHECKPOINT_HEADER = struct.Struct("<4sBBBHIQQQ")
+_SEARCHES = ("fast", "lean")
+_TYPECODES = {1: "B", 2: "H"}
 
 
 @dataclass
@@ -54,14 +78,48 @@ class MutationIterator:
         raise StopIteration
 
     def gen_mutations(self) -> Iterator[Mutation]:
-        mutation_options = itertools.product(
-            range(self.length), range(2, self.length + 1)
-        )
-        mutation_filtered = filter(
-            lambda x: x[0] + x[1] <= self.length, mutation_options
-        )
-        mutation_iter = map(lambda x: Mutation(x[0], x[1]), mutation_filtered)
-        return mutation_iter
+        return iter(mutation_table(self.length))
+
+
+class SolveTimeout(TimeoutError):
+    pass
+
+
+@dataclass
+class Checkpoint:
+    """
+    the state of an interrupted search.
+
+    for the "fast" search `frontier` holds the evolutions with `depth` mutations, the first
+    `position` of them are expanded into `expanded`. for the "lean" search `position` is the
+    number of mutation combinations of length `depth` that were already tried. the searches
+    keep no visited table or bound, the first solution they find is the shortest.
+
+    """
+
+    search: str
+    sequence: list[int]
+    depth: int
+    position: int
+    frontier: list[MutationList]
+    expanded: list[MutationList]
+
+
+class Checkpointer:
+    def __init__(self, path: Path, interval: float = 60.0) -> None:
+        self.path = path
+        self.interval = interval
+        self.saved = time.monotonic()
+
+    def due(self) -> bool:
+        return time.monotonic() - self.saved >= self.interval
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        write_checkpoint(self.path, checkpoint)
+        self.saved = time.monotonic()
+
+    def load(self) -> Checkpoint:
+        return read_checkpoint(self.path)
 
 
 class Evolution:
@@ -89,21 +147,31 @@ class Evolution:
 
 class EvolutionIterator:
     def __init__(
-        self, evolution: Evolution, mutation_iters: list[MutationIterator]
+        self,
+        evolution: Evolution,
+        mutation_iters: list[MutationIterator],
+        start: int = 0,
     ) -> None:
         self.evolution = evolution
         self.mutation_iters = mutation_iters
         self.evolution_iter = None
+        self.start = start
+        self.position = start
 
     def __call__(self, mutation_iter: MutationIterator) -> Self:
         return EvolutionIterator(self.evolution, [*self.mutation_iters, mutation_iter])
 
     def __iter__(self) -> Self:
-        self.evolution_iter = itertools.product(*self.mutation_iters)
+        mutations = itertools.product(*self.mutation_iters)
+        self.evolution_iter = enumerate(
+            itertools.islice(mutations, self.start, None), self.start + 1
+        )
+        self.position = self.start
         return self
 
     def __next__(self) -> Evolution:
-        for mutations in self.evolution_iter:
+        for position, mutations in self.evolution_iter:
+            self.position = position
             if any(map(lambda mut: self.evolution | mut, mutations)):
                 continue
             return reduce(lambda ev, mut: ev + mut, mutations, self.evolution)
@@ -111,6 +179,84 @@ class EvolutionIterator:
 
 
 def inversion_mutations(input_file: Path, output_file: Path) -> None:
+    sequences = read_sequences(input_file)
+
+    data = ""
+    for sequence in sequences:
+        if not sequence:
+            continue
+
+        print(f"Sequence: {sequence}")
+        solution = solve_sequence(sequence)
+        data += format_the_output(sequence, solution.mutations)
+
+    with open(output_file, "w") as f:
+        f.write(data)
+
+
+def inversion_mutations_binary(input_file: Path, output_file: Path) -> None:
+    """
+    the binary counterpart of inversion_mutations.
+
+    it reads fixed-width permutation records from a binary sequences file and only writes the
+    reversal operations of every solution, not the intermediate permutations.
+
+    """
+    itemsize = read_binary_itemsize(input_file)
+    solutions = (
+        solve_sequence(sequence).mutations
+        for sequence in read_binary_sequences(input_file)
+    )
+    write_binary_operations(output_file, solutions, itemsize)
+
+
+def solve_sequence(
+    sequence: list[int],
+    deadline: float | None = None,
+    checkpointer: Checkpointer | None = None,
+) -> Evolution:
+    evolution = Evolution(sequence, MutationList([]))
+    if evolution.solved:
+        return evolution
+
+    mutation_iterator = MutationIterator(len(sequence))
+    return find_evolution_fast([evolution], mutation_iterator, deadline, checkpointer)
+
+
+def resume_evolution(
+    checkpointer: Checkpointer, deadline: float | None = None
+) -> Evolution:
+    """
+    continue the search saved in the checkpoint file of the checkpointer.
+
+    the search keeps saving its progress to the same file. `deadline` only applies to the
+    fast search.
+
+    """
+    checkpoint = checkpointer.load()
+    root = Evolution(checkpoint.sequence, MutationList([]))
+    mutation_iterator = MutationIterator(len(root))
+
+    if checkpoint.search == "lean":
+        evolution_iter = EvolutionIterator(
+            root, [mutation_iterator] * checkpoint.depth, checkpoint.position
+        )
+        return find_evolution_lean(evolution_iter, mutation_iterator, checkpointer)
+
+    def replay(mutations: MutationList) -> Evolution:
+        return reduce(lambda ev, mut: ev + mut, mutations.mutations, root)
+
+    return _find_evolution_fast_from(
+        list(map(replay, checkpoint.frontier)),
+        mutation_iterator,
+        deadline,
+        checkpointer,
+        checkpoint.position,
+        list(map(replay, checkpoint.expanded)),
+    )
+
+
+def read_sequences(input_file: Path) -> list[list[int]]:
     with open(input_file, "r") as f:
         raw_data = f.read()
 
@@ -120,19 +266,14 @@ def inversion_mutations(input_file: Path, output_file: Path) -> None:
     for i, line in enumerate(data):
         sequences.append(list(map(int, line.split())))
 
-    data = ""
-    for sequence in sequences:
-        if not sequence:
-            continue
+    return sequences
 
-        print(f"Sequence: {sequence}")
-        mutation_iterator = MutationIterator(len(sequence))
-        evolution = Evolution(sequence, MutationList([]))
-        solution = find_evolution_fast([evolution], mutation_iterator)
-        data += format_the_output(sequence, solution.mutations)
+
+def write_sequences(output_file: Path, sequences: list[list[int]]) -> None:
+    lines = [" ".join(map(str, sequence)) for sequence in sequences]
 
     with open(output_file, "w") as f:
-        f.write(data)
+        f.write("\n".join([str(len(sequences)), *lines]) + "\n")
 
 
 def find_evolution(evolutions: list[Evolution], *_) -> Evolution:
@@ -153,20 +294,76 @@ def find_evolution(evolutions: list[Evolution], *_) -> Evolution:
 
 
 def find_evolution_fast(
-    evolutions: list[Evolution], mutation_iterator: MutationIterator
+    evolutions: list[Evolution],
+    mutation_iterator: MutationIterator,
+    deadline: float | None = None,
+    checkpointer: Checkpointer | None = None,
 ) -> Evolution:
-    evaluated_evolutions: list[Evolution] = []
+    """
+    a breadth first search for the shortest evolution that sorts the sequence.
 
-    for evolution in evolution_iterator(evolutions, mutation_iterator):
-        if evolution.solved:
-            return evolution
-        evaluated_evolutions.append(evolution)
+    `deadline` is a time.monotonic() timestamp. the search checks it between evolutions and
+    raises SolveTimeout once it has passed, so an abandoned search stops using its worker.
 
-    return find_evolution_fast(evaluated_evolutions, mutation_iterator)
+    with a checkpointer the search saves its frontier whenever the checkpointer is due, see
+    resume_evolution.
+
+    """
+    return _find_evolution_fast_from(
+        evolutions, mutation_iterator, deadline, checkpointer, 0, []
+    )
+
+
+def _find_evolution_fast_from(
+    evolutions: list[Evolution],
+    mutation_iterator: MutationIterator,
+    deadline: float | None,
+    checkpointer: Checkpointer | None,
+    position: int,
+    evaluated_evolutions: list[Evolution],
+) -> Evolution:
+    for index in range(position, len(evolutions)):
+        if checkpointer is not None and checkpointer.due():
+            checkpointer.save(_fast_checkpoint(evolutions, index, evaluated_evolutions))
+
+        for evolution in evolution_iterator(
+            evolutions[index : index + 1], mutation_iterator
+        ):
+            if evolution.solved:
+                return evolution
+            if deadline is not None and time.monotonic() > deadline:
+                raise SolveTimeout(
+                    f"no solution found within {len(evolution.mutations)} mutations"
+                )
+            evaluated_evolutions.append(evolution)
+
+    return _find_evolution_fast_from(
+        evaluated_evolutions, mutation_iterator, deadline, checkpointer, 0, []
+    )
+
+
+def _fast_checkpoint(
+    evolutions: list[Evolution], position: int, expanded: list[Evolution]
+) -> Checkpoint:
+    mutations = evolutions[0].mutations.mutations
+    sequence = reduce(
+        inverse_mutations_on_location, reversed(mutations), evolutions[0].sequence
+    )
+
+    return Checkpoint(
+        "fast",
+        sequence,
+        len(mutations),
+        position,
+        [evolution.mutations for evolution in evolutions],
+        [evolution.mutations for evolution in expanded],
+    )
 
 
 def find_evolution_lean(
-    evolution_iter: EvolutionIterator, mutation_iter: MutationIterator
+    evolution_iter: EvolutionIterator,
+    mutation_iter: MutationIterator,
+    checkpointer: Checkpointer | None = None,
 ) -> Evolution:
     """
     a recursive function to find the best solution for the given evolution.
@@ -176,12 +373,28 @@ def find_evolution_lean(
 
     when it does not find a solution, it will call itself with a double mutation iterator.
 
+    with a checkpointer it saves how many mutation combinations it tried whenever the
+    checkpointer is due, see resume_evolution.
+
     """
     for evolution in evolution_iter:
         if evolution.solved:
             return evolution
-
-    return find_evolution_lean(evolution_iter(mutation_iter), mutation_iter)
+        if checkpointer is not None and checkpointer.due():
+            checkpointer.save(
+                Checkpoint(
+                    "lean",
+                    evolution_iter.evolution.sequence,
+                    len(evolution_iter.mutation_iters),
+                    evolution_iter.position,
+                    [],
+                    [],
+                )
+            )
+
+    return find_evolution_lean(
+        evolution_iter(mutation_iter), mutation_iter, checkpointer
+    )
 
 
 def evolution_iterator(
@@ -198,6 +411,11 @@ def find_mutations(length: int) -> list[Mutation]:
     return mutation_objects
 
 
+@lru_cache(maxsize=MUTATION_TABLES)
+def mutation_table(length: int) -> tuple[Mutation, ...]:
+    return tuple(find_mutations(length))
+
+
 def filter_mutations_to_most_sorted(
     evolution: Evolution, mutations: list[Mutation]
 ) -> list[Mutation]:
@@ -251,5 +469,322 @@ def format_the_output(sequence: list[int], mutations: MutationList) -> str:
     return f"{len(mutations)}\n{steps_str}\n"
 
 
+def read_binary_itemsize(input_file: Path) -> int:
+    with open(input_file, "rb") as f:
+        header = f.read(_SEQUENCES_HEADER.size)
+
+    return _unpack_sequences_header(header)[0]
+
+
+def read_binary_sequences(input_file: Path) -> Iterator[list[int]]:
+    """
+    read the permutations of a binary sequences file through a memory map.
+
+    the file is a header followed by `count` records of `width` little-endian unsigned integers
+    of `itemsize` bytes. records shorter than `width` are padded with zeros, which can never be
+    part of a permutation of 1..n.
+
+    """
+    with (
+        open(input_file, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+    ):
+        itemsize, width, count = _unpack_sequences_header(mm)
+        end = _SEQUENCES_HEADER.size + count * width * itemsize
+        if len(mm) < end:
+            raise ValueError(f"{input_file} is truncated")
+
+        view = memoryview(mm)[_SEQUENCES_HEADER.size : end]
+        records = _as_integers(view, itemsize)
+        try:
+            for i in range(count):
+                record = records[i * width : (i + 1) * width].tolist()
+                if 0 in record:
+                    record = record[: record.index(0)]
+                yield record
+        finally:
+            if isinstance(records, memoryview):
+                records.release()
+            view.release()
+
+
+def write_binary_sequences(output_file: Path, sequences: list[list[int]]) -> None:
+    # 0 pads the records, so it can not be part of a sequence
+    smallest = min(map(min, filter(None, sequences)), default=1)
+    if smallest < 1:
+        raise ValueError(f"{smallest} does not fit in a binary record")
+
+    width = max(map(len, sequences), default=0)
+    itemsize = _itemsize_for(max(map(max, filter(None, sequences)), default=0))
+
+    records = array(_TYPECODES[itemsize])
+    for sequence in sequences:
+        records.extend(sequence)
+        records.extend([0] * (width - len(sequence)))
+    if sys.byteorder != "little":
+        records.byteswap()
+
+    with open(output_file, "wb") as f:
+        f.write(
+            _SEQUENCES_HEADER.pack(
+                SEQUENCES_MAGIC, BINARY_VERSION, itemsize, width, len(sequences)
+            )
+        )
+        f.write(records.tobytes())
+
+
+def read_binary_operations(input_file: Path) -> Iterator[MutationList]:
+    """
+    read the reversal operations of a binary output file.
+
+    every record is the number of operations k followed by k (start, end) pairs, with `end`
+    exclusive like Mutation.end.
+
+    """
+    with open(input_file, "rb") as f:
+        raw_data = f.read()
+
+    magic, version, itemsize, count = _OPERATIONS_HEADER.unpack_from(raw_data)
+    if magic != OPERATIONS_MAGIC or version != BINARY_VERSION:
+        raise ValueError(f"{input_file} is not a binary operations file")
+
+    operations = array(_TYPECODES[itemsize], raw_data[_OPERATIONS_HEADER.size :])
+    if sys.byteorder != "little":
+        operations.byteswap()
+
+    index = 0
+    for _ in range(count):
+        length = operations[index]
+        pairs = operations[index + 1 : index + 1 + 2 * length]
+        index += 1 + 2 * length
+        yield MutationList(
+            [
+                Mutation(start, end - start)
+                for start, end in zip(pairs[::2], pairs[1::2])
+            ]
+        )
+
+
+def write_binary_operations(
+    output_file: Path, solutions: Iterable[MutationList], itemsize: int
+) -> None:
+    operations = array(_TYPECODES[itemsize])
+    count = 0
+    for mutations in solutions:
+        operations.append(len(mutations))
+        for mutation in mutations.mutations:
+            operations.extend((mutation.start, mutation.end))
+        count += 1
+    if sys.byteorder != "little":
+        operations.byteswap()
+
+    with open(output_file, "wb") as f:
+        f.write(
+            _OPERATIONS_HEADER.pack(OPERATIONS_MAGIC, BINARY_VERSION, itemsize, count)
+        )
+        f.write(operations.tobytes())
+
+
+def write_checkpoint(output_file: Path, checkpoint: Checkpoint) -> None:
+    """
+    write a checkpoint as a header followed by the sequence and the (start, end) operations
+    of every frontier and expanded evolution.
+
+    the data is synced to disk before the file is atomically replaced, so a preempted write
+    or a lost node leaves the previous checkpoint intact.
+
+    """
+    length = len(checkpoint.sequence)
+    itemsize = _itemsize_for(max(length, *checkpoint.sequence))
+
+    items = array(_TYPECODES[itemsize], checkpoint.sequence)
+    for mutations in itertools.chain(checkpoint.frontier, checkpoint.expanded):
+        for mutation in mutations.mutations:
+            items.extend((mutation.start, mutation.end))
+    if sys.byteorder != "little":
+        items.byteswap()
+
+    temporary_file = output_file.with_name(output_file.name + ".tmp")
+    with open(temporary_file, "wb") as f:
+        f.write(
+            _CHECKPOINT_HEADER.pack(
+                CHECKPOINT_MAGIC,
+                BINARY_VERSION,
+                _SEARCHES.index(checkpoint.search),
+                itemsize,
+                length,
+                checkpoint.depth,
+                checkpoint.position,
+                len(checkpoint.frontier),
+                len(checkpoint.expanded),
+            )
+        )
+        f.write(items.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_file, output_file)
+    _sync_directory(output_file.parent)
+
+
+def read_checkpoint(input_file: Path) -> Checkpoint:
+    with open(input_file, "rb") as f:
+        raw_data = f.read()
+
+    if len(raw_data) < _CHECKPOINT_HEADER.size:
+        raise ValueError(f"{input_file} is not a checkpoint file")
+
+    (
+        magic,
+        version,
+        search,
+        itemsize,
+        length,
+        depth,
+        position,
+        frontier_count,
+        expanded_count,
+    ) = _CHECKPOINT_HEADER.unpack_from(raw_data)
+    if magic != CHECKPOINT_MAGIC or version != BINARY_VERSION:
+        raise ValueError(f"{input_file} is not a checkpoint file")
+
+    items = array(_TYPECODES[itemsize], raw_data[_CHECKPOINT_HEADER.size :])
+    if sys.byteorder != "little":
+        items.byteswap()
+
+    def mutation_lists(start: int, count: int, size: int) -> list[MutationList]:
+        offsets = (start + 2 * size * i for i in range(count))
+        return [
+            MutationList(
+                [
+                    Mutation(items[i], items[i + 1] - items[i])
+                    for i in range(offset, offset + 2 * size, 2)
+                ]
+            )
+            for offset in offsets
+        ]
+
+    expanded_start = length + 2 * depth * frontier_count
+    return Checkpoint(
+        _SEARCHES[search],
+        items[:length].tolist(),
+        depth,
+        position,
+        mutation_lists(length, frontier_count, depth),
+        mutation_lists(expanded_start, expanded_count, depth + 1),
+    )
+
+
+def text_to_binary_sequences(input_file: Path, output_file: Path) -> None:
+    sequences = [sequence for sequence in read_sequences(input_file) if sequence]
+    write_binary_sequences(output_file, sequences)
+
+
+def binary_to_text_sequences(input_file: Path, output_file: Path) -> None:
+    write_sequences(output_file, list(read_binary_sequences(input_file)))
+
+
+def binary_to_text_output(
+    sequences_file: Path, operations_file: Path, output_file: Path
+) -> None:
+    """
+    expand a binary output file into the text output of inversion_mutations.
+
+    the operations only make sense next to the sequences they were solved for, so both binary
+    files are needed to replay the intermediate permutations.
+
+    """
+    data = ""
+    for sequence, mutations in zip(
+        read_binary_sequences(sequences_file),
+        read_binary_operations(operations_file),
+        strict=True,
+    ):
+        data += format_the_output(sequence, mutations)
+
+    with open(output_file, "w") as f:
+        f.write(data)
+
+
+def text_to_binary_output(input_file: Path, output_file: Path) -> None:
+    with open(input_file, "r") as f:
+        lines = [line for line in f.read().split("\n") if line.strip()]
+
+    solutions: list[MutationList] = []
+    largest = 0
+    index = 0
+    while index < len(lines):
+        length = int(lines[index])
+        if length < 0:
+            raise ValueError(f"solution {len(solutions)} was not solved")
+        steps = [
+            list(map(int, line.split()))
+            for line in lines[index + 1 : index + length + 2]
+        ]
+        index += length + 2
+
+        largest = max(largest, *steps[0])
+        solutions.append(
+            MutationList(
+                [find_applied_mutation(a, b) for a, b in itertools.pairwise(steps)]
+            )
+        )
+
+    write_binary_operations(output_file, solutions, _itemsize_for(largest))
+
+
+def find_applied_mutation(before: list[int], after: list[int]) -> Mutation:
+    changed = [i for i, (x, y) in enumerate(zip(before, after)) if x != y]
+    if not changed:
+        raise ValueError(f"no mutation between {before} and {after}")
+
+    mutation = Mutation(changed[0], changed[-1] - changed[0] + 1)
+    if inverse_mutations_on_location(before, mutation) != after:
+        raise ValueError(f"{before} -> {after} is not a single inversion")
+    return mutation
+
+
+def _sync_directory(directory: Path) -> None:
+    # persists the rename, directories can not be opened on every platform
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _unpack_sequences_header(buffer: bytes | mmap.mmap) -> tuple[int, int, int]:
+    if len(buffer) < _SEQUENCES_HEADER.size:
+        raise ValueError("not a binary sequences file")
+
+    magic, version, itemsize, width, count = _SEQUENCES_HEADER.unpack_from(buffer)
+    if (
+        magic != SEQUENCES_MAGIC
+        or version != BINARY_VERSION
+        or itemsize not in _TYPECODES
+    ):
+        raise ValueError("not a binary sequences file")
+    return itemsize, width, count
+
+
+def _as_integers(view: memoryview, itemsize: int) -> memoryview | array:
+    if sys.byteorder == "little":
+        return view.cast(_TYPECODES[itemsize])
+
+    records = array(_TYPECODES[itemsize], view)
+    records.byteswap()
+    return records
+
+
+def _itemsize_for(largest: int) -> int:
+    if largest < 1 << 8:
+        return 1
+    if largest < 1 << 16:
+        return 2
+    raise ValueError(f"{largest} does not fit in a binary record")
+
+
 if __name__ == "__main__":
     inversion_mutations(Path("input.txt"), Path("output.txt"))
@@ -0,0 +1,190 @@
+"""
+solve a batch of sequences cheapest first while still emitting the results in input order.
+
+    python scheduler.py input.txt output.txt --workers 4 --deadline 60
+
+"""
+
+import argparse
+import itertools
+import math
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from main import (
+    MutationList,
+    SolveTimeout,
+    format_the_output,
+    read_sequences,
+    solve_sequence,
+)
+
+
+@dataclass
+class ScheduledResult:
+    index: int
+    sequence: list[int]
+    estimated_cost: float
+    mutations: MutationList | None
+    queue_time: float
+    solve_time: float
+
+    @property
+    def timed_out(self) -> bool:
+        return self.mutations is None
+
+    def __str__(self) -> str:
+        status = "timeout" if self.timed_out else f"{len(self.mutations)} mutations"
+        return (
+            f"Sequence {self.index}: {status}, cost {self.estimated_cost:.3g}, "
+            f"queued {self.queue_time:.2f}s, solved {self.solve_time:.2f}s"
+        )
+
+
+def breakpoints(sequence: list[int]) -> int:
+    """
+    count the neighbours that are not consecutive numbers, with 0 and n + 1 framing the sequence.
+
+    a reversal removes at most two breakpoints, so half of them is a lower bound on the number
+    of mutations.
+
+    """
+    framed = [0, *sequence, len(sequence) + 1]
+    return sum(1 for x, y in itertools.pairwise(framed) if abs(x - y) != 1)
+
+
+def has_decreasing_strip(sequence: list[int]) -> bool:
+    """
+    check for a run of at least two consecutive numbers in decreasing order.
+
+    without one no single reversal can remove two breakpoints.
+
+    """
+    return any(x - y == 1 for x, y in itertools.pairwise(sequence))
+
+
+def estimate_depth(sequence: list[int]) -> int:
+    count = breakpoints(sequence)
+    if count == 0:
+        return 0
+
+    return math.ceil(count / 2) + (not has_decreasing_strip(sequence))
+
+
+def estimate_cost(sequence: list[int]) -> float:
+    """
+    estimate the natural log of the work find_evolution_fast does for the sequence.
+
+    every level multiplies the frontier by the number of possible mutations and every evolution
+    costs a quadratic sequence_quality. the log keeps long sequences from overflowing a float.
+
+    """
+    length = max(len(sequence), 1)
+    mutations = max(length * (length - 1) // 2, 1)
+    return 2 * math.log(length) + estimate_depth(sequence) * math.log(mutations)
+
+
+def solve_scheduled(
+    sequences: list[list[int]],
+    workers: int | None = None,
+    deadline: float | None = None,
+    executor: Executor | None = None,
+) -> Iterator[ScheduledResult]:
+    """
+    solve the sequences on a worker pool, cheapest estimated cost first.
+
+    every sequence gets `deadline` seconds of solving before it is abandoned with `mutations`
+    None. the results are yielded in input order as soon as all earlier ones are done.
+
+    """
+    costs = [estimate_cost(sequence) for sequence in sequences]
+    order = sorted(range(len(sequences)), key=costs.__getitem__)
+
+    own_executor = executor is None
+    if executor is None:
+        executor = ProcessPoolExecutor(workers or os.cpu_count())
+
+    try:
+        submitted = time.monotonic()
+        futures = {
+            executor.submit(_solve_timed, sequences[index], deadline): index
+            for index in order
+        }
+
+        finished: dict[int, ScheduledResult] = {}
+        next_index = 0
+        for future in as_completed(futures):
+            index = futures[future]
+            mutations, started, stopped = future.result()
+            finished[index] = ScheduledResult(
+                index,
+                sequences[index],
+                costs[index],
+                mutations,
+                started - submitted,
+                stopped - started,
+            )
+
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def inversion_mutations_scheduled(
+    input_file: Path,
+    output_file: Path,
+    workers: int | None = None,
+    deadline: float | None = None,
+) -> None:
+    """
+    the scheduled counterpart of inversion_mutations.
+
+    a sequence that runs out of time is written as a mutation count of -1 followed by the
+    unchanged sequence. text_to_binary_output has no record for it and raises ValueError
+    on such a file.
+
+    """
+    sequences = [sequence for sequence in read_sequences(input_file) if sequence]
+
+    data = ""
+    for result in solve_scheduled(sequences, workers, deadline):
+        print(result)
+        if result.timed_out:
+            data += f"-1\n{' '.join(map(str, result.sequence))}\n"
+        else:
+            data += format_the_output(result.sequence, result.mutations)
+
+    with open(output_file, "w") as f:
+        f.write(data)
+
+
+def _solve_timed(
+    sequence: list[int], deadline: float | None
+) -> tuple[MutationList | None, float, float]:
+    started = time.monotonic()
+    try:
+        mutations = solve_sequence(
+            sequence, None if deadline is None else started + deadline
+        ).mutations
+    except SolveTimeout:
+        mutations = None
+
+    return mutations, started, time.monotonic()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--deadline", type=float, default=None)
+    args = parser.parse_args()
+
+    inversion_mutations_scheduled(args.input, args.output, args.workers, args.deadline)
@@ -0,0 +1,496 @@
+"""
+a long running solver service that speaks JSON lines over a unix socket or local TCP.
+
+a request is one line `{"id": 1, "sequence": [3, 2, 1], "deadline": 5.0}` where the deadline,
+in seconds, is optional. the response carries the same id and either the reversal operations
+as `[start, end]` pairs, `{"id": 1, "mutations": [[0, 3]]}`, or an error,
+`{"id": 1, "error": "timeout"}`.
+
+    python service.py serve --address unix:/tmp/swapsort.sock
+    python service.py solve --address unix:/tmp/swapsort.sock 3 2 1 4
+    python service.py load --address unix:/tmp/swapsort.sock --input input.txt
+
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Self
+
+from main import Mutation, MutationList, SolveTimeout, read_sequences, solve_sequence
+from scheduler import estimate_cost
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE = 30.0
+DEFAULT_MAX_LENGTH = 256
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_BATCH_WINDOW = 0.002
+DEFAULT_CACHE_SIZE = 1 << 16
+
+
+def solve_batch(
+    sequences: list[tuple[int, ...]], deadlines: list[float]
+) -> list[MutationList | None]:
+    """
+    solve a batch of sequences inside a worker, None for every sequence that ran out of time.
+
+    the deadlines are time.monotonic() timestamps, which are shared between the processes of
+    one machine.
+
+    """
+    solutions: list[MutationList | None] = []
+    for sequence, deadline in zip(sequences, deadlines):
+        try:
+            solutions.append(solve_sequence(list(sequence), deadline).mutations)
+        except SolveTimeout:
+            solutions.append(None)
+
+    return solutions
+
+
+@dataclass
+class _Job:
+    sequence: tuple[int, ...]
+    deadline: float
+    future: asyncio.Future = field(repr=False)
+
+
+class SolverService:
+    """
+    solve sequences on a persistent worker pool.
+
+    concurrent requests are collected for at most `batch_window` seconds or `batch_size`
+    requests and then dealt over the workers by estimated cost, one submission per worker.
+    solutions are kept in an LRU cache and a sequence that is already being solved is not
+    queued a second time. requests for sequences longer than `max_length` are rejected,
+    every length that is solved builds a move table in the workers.
+
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        workers: int | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        default_deadline: float = DEFAULT_DEADLINE,
+        max_length: int = DEFAULT_MAX_LENGTH,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor or ProcessPoolExecutor(self.workers)
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.cache_size = cache_size
+        self.default_deadline = default_deadline
+        self.max_length = max_length
+
+        self._cache: OrderedDict[tuple[int, ...], MutationList] = OrderedDict()
+        self._pending: dict[tuple[int, ...], _Job] = {}
+        self._queue: asyncio.Queue[_Job] = asyncio.Queue()
+        self._tasks: set[asyncio.Task] = set()
+        self._batcher: asyncio.Task | None = None
+
+    async def __aenter__(self) -> Self:
+        self._batcher = asyncio.create_task(self._run_batches())
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._batcher
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.executor.shutdown()
+
+    @property
+    def cached(self) -> int:
+        """the number of solutions in the cache."""
+        return len(self._cache)
+
+    async def listen(self, address: str) -> asyncio.Server:
+        host, port = parse_address(address)
+        if host == "unix":
+            return await asyncio.start_unix_server(self._handle_connection, port)
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def solve(
+        self, sequence: list[int], deadline: float | None = None
+    ) -> MutationList:
+        key = tuple(sequence)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        if deadline is None:
+            deadline = self.default_deadline
+        expires = time.monotonic() + deadline
+
+        job = self._pending.get(key)
+        if job is None:
+            job = _Job(key, expires, asyncio.get_running_loop().create_future())
+            self._pending[key] = job
+            self._queue.put_nowait(job)
+        else:
+            job.deadline = max(job.deadline, expires)
+
+        try:
+            solution = await asyncio.wait_for(
+                asyncio.shield(job.future), max(expires - time.monotonic(), 0)
+            )
+        except TimeoutError:
+            solution = None
+
+        if solution is None:
+            raise SolveTimeout(f"no solution for {sequence} within {deadline}s")
+        return solution
+
+    async def _run_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            closes = loop.time() + self.batch_window
+            while (
+                len(batch) < self.batch_size and (remaining := closes - loop.time()) > 0
+            ):
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except TimeoutError:
+                    break
+
+            try:
+                for chunk in _split(batch, self.workers):
+                    task = asyncio.create_task(self._solve_chunk(chunk))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            except Exception as error:
+                logger.exception(
+                    "dispatching a batch of %d requests failed", len(batch)
+                )
+                self._fail(batch, error)
+
+    async def _solve_chunk(self, jobs: list[_Job]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            solutions = await loop.run_in_executor(
+                self.executor,
+                solve_batch,
+                [job.sequence for job in jobs],
+                [job.deadline for job in jobs],
+            )
+        except Exception as error:
+            logger.exception("solving a chunk of %d requests failed", len(jobs))
+            self._fail(jobs, error)
+        else:
+            self._finish(jobs, solutions)
+
+    def _finish(self, jobs: list[_Job], solutions: list[MutationList | None]) -> None:
+        for job, solution in zip(jobs, solutions):
+            if solution is None and job.deadline > time.monotonic():
+                # a later request for the same sequence extended the deadline while the
+                # worker was still solving it with the earlier one
+                self._queue.put_nowait(job)
+                continue
+
+            del self._pending[job.sequence]
+            if solution is not None:
+                self._remember(job.sequence, solution)
+            job.future.set_result(solution)
+
+    def _fail(self, jobs: list[_Job], error: Exception) -> None:
+        for job in jobs:
+            del self._pending[job.sequence]
+            job.future.set_exception(error)
+            # the waiters may all have timed out already, the error is logged by the caller
+            job.future.exception()
+
+    def _remember(self, sequence: tuple[int, ...], solution: MutationList) -> None:
+        self._cache[sequence] = solution
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        requests: set[asyncio.Task] = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._handle_request(line, writer))
+                requests.add(task)
+                task.add_done_callback(requests.discard)
+            await asyncio.gather(*requests)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _handle_request(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            sequence = request["sequence"]
+            deadline = request.get("deadline")
+            if not sequence or not all(type(item) is int for item in sequence):
+                raise ValueError("sequence must be a list of integers")
+            if len(sequence) > self.max_length:
+                raise ValueError(f"sequence is longer than {self.max_length}")
+            if deadline is not None and type(deadline) not in (int, float):
+                raise ValueError("deadline must be a number of seconds")
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            response = {"id": request_id, "error": f"invalid request: {error!r}"}
+        else:
+            try:
+                solution = await self.solve(sequence, deadline)
+                response = {
+                    "id": request_id,
+                    "mutations": [[mut.start, mut.end] for mut in solution.mutations],
+                }
+            except SolveTimeout:
+                response = {"id": request_id, "error": "timeout"}
+            except Exception as error:
+                logger.exception("solving request %r failed", request_id)
+                response = {"id": request_id, "error": f"solving failed: {error!r}"}
+
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+
+class SolverClient:
+    """
+    a client for SolverService that can have many requests in flight on one connection.
+    """
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._responses: dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, address: str) -> Self:
+        host, port = parse_address(address)
+        if host == "unix":
+            return cls(*await asyncio.open_unix_connection(port))
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        self._writer.close()
+        with suppress(ConnectionError):
+            await self._writer.wait_closed()
+        self._receiver.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._receiver
+
+    async def solve(
+        self, sequence: list[int], deadline: float | None = None
+    ) -> MutationList:
+        if self._receiver.done():
+            raise ConnectionError("the connection to the service is closed")
+
+        request_id = next(self._ids)
+        request = {"id": request_id, "sequence": sequence}
+        if deadline is not None:
+            request["deadline"] = deadline
+
+        response = self._responses[request_id] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._writer.write(json.dumps(request).encode() + b"\n")
+        await self._writer.drain()
+
+        return _to_solution(await response)
+
+    async def _receive(self) -> None:
+        error = ConnectionError("the service closed the connection")
+        try:
+            while line := await self._reader.readline():
+                response = json.loads(line)
+                future = self._responses.pop(response["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (AttributeError, KeyError, TypeError, ValueError) as malformed:
+            error = ConnectionError(
+                f"malformed response from the service: {malformed!r}"
+            )
+        finally:
+            for future in self._responses.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._responses.clear()
+
+
+@dataclass
+class LoadReport:
+    requests: int
+    timeouts: int
+    elapsed: float
+    latencies: list[float]
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, percent: float) -> float:
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))]
+
+    def __str__(self) -> str:
+        return (
+            f"Requests: {self.requests} ({self.timeouts} timeouts) in {self.elapsed:.2f}s, "
+            f"{self.throughput:.1f}/s, "
+            f"p50 {self.percentile(50) * 1000:.1f}ms, p99 {self.percentile(99) * 1000:.1f}ms"
+        )
+
+
+async def generate_load(
+    address: str,
+    sequences: list[list[int]],
+    requests: int,
+    concurrency: int = 8,
+    deadline: float | None = None,
+) -> LoadReport:
+    """
+    send `requests` solves, cycling through `sequences`, from `concurrency` clients at once.
+    """
+    sequence_iter = itertools.islice(itertools.cycle(sequences), requests)
+    latencies: list[float] = []
+    timeouts = 0
+
+    async def caller() -> None:
+        nonlocal timeouts
+        async with await SolverClient.connect(address) as client:
+            for sequence in sequence_iter:
+                start_time = time.perf_counter()
+                try:
+                    await client.solve(sequence, deadline)
+                except SolveTimeout:
+                    timeouts += 1
+                latencies.append(time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start_time
+
+    return LoadReport(len(latencies), timeouts, elapsed, latencies)
+
+
+def parse_address(address: str) -> tuple[str, str | int]:
+    """
+    split `unix:/path/to.sock` or `host:port` into ("unix", path) or (host, port).
+    """
+    if address.startswith("unix:"):
+        return "unix", address.removeprefix("unix:")
+
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"invalid address: {address}")
+    return host, int(port)
+
+
+def _to_solution(response: dict) -> MutationList:
+    if response.get("error") == "timeout":
+        raise SolveTimeout(f"request {response['id']} timed out")
+    if "error" in response:
+        raise ValueError(response["error"])
+
+    return MutationList(
+        [Mutation(start, end - start) for start, end in response["mutations"]]
+    )
+
+
+def _split(jobs: list[_Job], parts: int) -> list[list[_Job]]:
+    """
+    deal the jobs cheapest first over at most `parts` chunks.
+
+    every chunk gets a share of the expensive sequences and runs its cheap ones first.
+
+    """
+    jobs = sorted(jobs, key=lambda job: estimate_cost(list(job.sequence)))
+    return [chunk for chunk in (jobs[i::parts] for i in range(parts)) if chunk]
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    async with SolverService(
+        workers=args.workers,
+        batch_size=args.batch_size,
+        batch_window=args.batch_window,
+        default_deadline=args.deadline,
+        max_length=args.max_length,
+    ) as service:
+        server = await service.listen(args.address)
+        print(f"Serving on {args.address}")
+        async with server:
+            await server.serve_forever()
+
+
+async def _solve(args: argparse.Namespace) -> None:
+    async with await SolverClient.connect(args.address) as client:
+        print(await client.solve(args.sequence, args.deadline))
+
+
+async def _load(args: argparse.Namespace) -> None:
+    sequences = [sequence for sequence in read_sequences(args.input) if sequence]
+    report = await generate_load(
+        args.address, sequences, args.requests, args.concurrency, args.deadline
+    )
+    print(report)
+
+
+def cli(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the solver service")
+    serve.add_argument("--workers", type=int, default=None)
+    serve.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    serve.add_argument("--batch-window", type=float, default=DEFAULT_BATCH_WINDOW)
+    serve.add_argument("--max-length", type=int, default=DEFAULT_MAX_LENGTH)
+    serve.set_defaults(run=_serve, deadline=DEFAULT_DEADLINE)
+
+    solve = commands.add_parser("solve", help="solve one sequence")
+    solve.add_argument("sequence", type=int, nargs="+")
+    solve.set_defaults(run=_solve)
+
+    load = commands.add_parser("load", help="send the sequences of a file as load")
+    load.add_argument("--input", type=Path, required=True)
+    load.add_argument("--requests", type=int, default=1000)
+    load.add_argument("--concurrency", type=int, default=8)
+    load.set_defaults(run=_load)
+
+    for command in (serve, solve, load):
+        command.add_argument("--address", default="unix:swapsort.sock")
+        command.add_argument(
+            "--deadline", type=float, default=command.get_default("deadline")
+        )
+
+    args = parser.parse_args(argv)
+    with suppress(KeyboardInterrupt):
+        asyncio.run(args.run(args))
+
+
+if __name__ == "__main__":
+    cli()
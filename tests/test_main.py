@@ -3,12 +3,17 @@ from pathlib import Path
 import pytest
 
 from main import (
+    Checkpoint,
+    Checkpointer,
     Evolution,
     EvolutionIterator,
     Mutation,
     MutationIterator,
     MutationList,
+    binary_to_text_output,
+    binary_to_text_sequences,
     filter_mutations_to_most_sorted,
+    find_applied_mutation,
     find_evolution_fast,
     find_evolution,
     find_evolution_lean,
@@ -16,10 +21,21 @@ from main import (
     inverse_mutations,
     inverse_mutations_on_location,
     inversion_mutations,
+    inversion_mutations_binary,
     is_mutation_needed,
+    mutation_table,
+    MUTATION_TABLES,
+    read_binary_operations,
+    read_binary_sequences,
+    read_checkpoint,
+    resume_evolution,
     is_solved,
     sequence_quality,
     find_mutations,
+    text_to_binary_output,
+    text_to_binary_sequences,
+    write_binary_sequences,
+    write_checkpoint,
 )
 
 
@@ -227,3 +243,177 @@ def test_acceptance_test_find_evolution_fast_and_lean_sequence_02():
         "1 2 3 4 5 8 7 6 9\n"
         "1 2 3 4 5 6 7 8 9\n"
     )
+
+
+def test_binary_sequences_round_trip(tmp_path):
+    binary_file = tmp_path / "sequences.bin"
+    text_file = tmp_path / "sequences.txt"
+
+    text_to_binary_sequences(Path("sample_sequence_set2.txt"), binary_file)
+    binary_to_text_sequences(binary_file, text_file)
+
+    assert text_file.read_text() == Path("sample_sequence_set2.txt").read_text()
+
+
+@pytest.mark.parametrize(
+    "sequences, expected_size",
+    [
+        ([[3, 2, 1], [2, 1]], 12 + 2 * 3),
+        ([[300, *range(1, 300)]], 12 + 2 * 300),
+    ],
+)
+def test_binary_sequences_fixed_width_records(tmp_path, sequences, expected_size):
+    binary_file = tmp_path / "sequences.bin"
+
+    write_binary_sequences(binary_file, sequences)
+
+    assert binary_file.stat().st_size == expected_size
+    assert list(read_binary_sequences(binary_file)) == sequences
+
+
+@pytest.mark.parametrize(
+    "sequences", [[[0, 2, 1], [1, 2, 3]], [[-1, 1]], [[1 << 16, 1]]]
+)
+def test_binary_sequences_rejects_unrepresentable_items(tmp_path, sequences):
+    with pytest.raises(ValueError):
+        write_binary_sequences(tmp_path / "sequences.bin", sequences)
+
+
+def test_binary_sequences_rejects_other_files(tmp_path):
+    with pytest.raises(ValueError):
+        list(read_binary_sequences(Path("sample_sequence_set1.txt")))
+
+
+def test_inversion_mutations_binary(tmp_path):
+    sequences_file = tmp_path / "sequences.bin"
+    operations_file = tmp_path / "operations.bin"
+    output_file = tmp_path / "output.txt"
+
+    text_to_binary_sequences(Path("sample_sequence_set1.txt"), sequences_file)
+    inversion_mutations_binary(sequences_file, operations_file)
+
+    assert list(read_binary_operations(operations_file)) == [
+        MutationList([Mutation(0, 3), Mutation(4, 4)]),
+        MutationList([Mutation(2, 2), Mutation(7, 2), Mutation(5, 3)]),
+    ]
+
+    binary_to_text_output(sequences_file, operations_file, output_file)
+    assert (
+        output_file.read_text() == Path("sample_sequence_set1_output.txt").read_text()
+    )
+
+
+def test_text_to_binary_output(tmp_path):
+    sequences_file = tmp_path / "sequences.bin"
+    operations_file = tmp_path / "operations.bin"
+    output_file = tmp_path / "output.txt"
+
+    text_to_binary_sequences(Path("sample_sequence_set2.txt"), sequences_file)
+    text_to_binary_output(Path("sample_sequence_set2_output.txt"), operations_file)
+    binary_to_text_output(sequences_file, operations_file, output_file)
+
+    assert (
+        output_file.read_text() == Path("sample_sequence_set2_output.txt").read_text()
+    )
+
+
+def test_find_applied_mutation():
+    assert find_applied_mutation([1, 4, 3, 2, 5], [1, 2, 3, 4, 5]) == Mutation(1, 3)
+
+    with pytest.raises(ValueError):
+        find_applied_mutation([1, 2, 3], [1, 2, 3])
+
+    with pytest.raises(ValueError):
+        find_applied_mutation([1, 2, 3, 4], [2, 1, 4, 3])
+
+
+def test_mutation_table_is_bounded():
+    for length in range(2, MUTATION_TABLES + 10):
+        assert len(mutation_table(length)) == length * (length - 1) // 2
+
+    assert mutation_table.cache_info().currsize <= MUTATION_TABLES
+
+
+class Preempted(Exception):
+    pass
+
+
+class PreemptingCheckpointer(Checkpointer):
+    def __init__(self, path, saves):
+        super().__init__(path, interval=0)
+        self.saves = saves
+
+    def save(self, checkpoint):
+        super().save(checkpoint)
+        self.saves -= 1
+        if self.saves == 0:
+            raise Preempted
+
+
+def test_checkpoint_round_trip(tmp_path):
+    checkpoint_file = tmp_path / "search.ckpt"
+    checkpoint = Checkpoint(
+        "fast",
+        [3, 2, 1, 4],
+        1,
+        1,
+        [MutationList([Mutation(0, 2)]), MutationList([Mutation(1, 3)])],
+        [MutationList([Mutation(0, 2), Mutation(2, 2)])],
+    )
+
+    write_checkpoint(checkpoint_file, checkpoint)
+
+    assert read_checkpoint(checkpoint_file) == checkpoint
+    assert not checkpoint_file.with_name("search.ckpt.tmp").exists()
+
+
+def test_checkpoint_rejects_other_files():
+    with pytest.raises(ValueError):
+        read_checkpoint(Path("sample_sequence_set1.txt"))
+
+
+@pytest.mark.parametrize("saves, depth", [(1, 0), (10, 1), (100, 2)])
+def test_resume_evolution_fast(tmp_path, saves, depth):
+    sequence = [1, 2, 4, 3, 5, 8, 7, 9, 6]
+    checkpoint_file = tmp_path / "search.ckpt"
+    expected = find_evolution_fast(
+        [Evolution(sequence, MutationList([]))], MutationIterator(len(sequence))
+    )
+
+    with pytest.raises(Preempted):
+        find_evolution_fast(
+            [Evolution(sequence, MutationList([]))],
+            MutationIterator(len(sequence)),
+            checkpointer=PreemptingCheckpointer(checkpoint_file, saves),
+        )
+
+    checkpoint = read_checkpoint(checkpoint_file)
+    assert (checkpoint.search, checkpoint.sequence) == ("fast", sequence)
+    assert checkpoint.depth == depth
+
+    solution = resume_evolution(Checkpointer(checkpoint_file))
+    assert solution.mutations == expected.mutations
+
+
+@pytest.mark.parametrize("saves, depth", [(10, 1), (100, 2)])
+def test_resume_evolution_lean(tmp_path, saves, depth):
+    sequence = [1, 2, 4, 3, 5, 8, 7, 9, 6]
+    checkpoint_file = tmp_path / "search.ckpt"
+    mutation_iterator = MutationIterator(len(sequence))
+    evolution = Evolution(sequence, MutationList([]))
+    expected = find_evolution_lean(
+        EvolutionIterator(evolution, [mutation_iterator]), mutation_iterator
+    )
+
+    with pytest.raises(Preempted):
+        find_evolution_lean(
+            EvolutionIterator(evolution, [mutation_iterator]),
+            mutation_iterator,
+            PreemptingCheckpointer(checkpoint_file, saves),
+        )
+
+    checkpoint = read_checkpoint(checkpoint_file)
+    assert (checkpoint.search, checkpoint.depth) == ("lean", depth)
+
+    solution = resume_evolution(Checkpointer(checkpoint_file))
+    assert solution.mutations == expected.mutations
@@ -0,0 +1,124 @@
+import math
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from main import solve_sequence, text_to_binary_output
+from scheduler import (
+    breakpoints,
+    estimate_cost,
+    estimate_depth,
+    inversion_mutations_scheduled,
+    solve_scheduled,
+)
+
+HARD_SEQUENCE = [1, 3, 2, 4, 5, 6, 7, 12, 11, 10, 8, 9]
+LONG_SEQUENCE = random.Random(0).sample(range(1, 301), 300)
+
+
+@pytest.mark.parametrize(
+    "sequence, expected",
+    [
+        ([1, 2, 3], 0),
+        ([2, 1], 2),
+        ([3, 2, 1, 4], 2),
+        ([2, 4, 1, 3], 5),
+        ([1, 2, 4, 3, 5, 8, 7, 9, 6], 6),
+    ],
+)
+def test_breakpoints(sequence, expected):
+    assert breakpoints(sequence) == expected
+
+
+@pytest.mark.parametrize(
+    "sequence, expected",
+    [
+        ([1, 2, 3], 0),
+        ([3, 2, 1, 4, 8, 7, 6, 5, 9], 2),
+        ([1, 2, 4, 3, 5, 8, 7, 9, 6], 3),
+        ([2, 4, 1, 3], 4),
+    ],
+)
+def test_estimate_depth(sequence, expected):
+    assert estimate_depth(sequence) == expected
+
+
+def test_estimate_cost_orders_by_difficulty():
+    sequences = [
+        HARD_SEQUENCE,
+        [1, 2, 4, 3, 5, 8, 7, 9, 6],
+        [3, 2, 1, 4, 8, 7, 6, 5, 9],
+        [2, 1],
+    ]
+
+    assert sorted(sequences, key=estimate_cost) == sequences[::-1]
+
+
+def test_estimate_cost_long_sequence():
+    assert math.isfinite(estimate_cost(LONG_SEQUENCE))
+    assert estimate_cost(LONG_SEQUENCE) > estimate_cost(HARD_SEQUENCE)
+
+
+def test_solve_scheduled_keeps_input_order():
+    sequences = [
+        [1, 4, 3, 2, 6, 5, 7, 10, 9, 8],
+        [2, 1],
+        [3, 2, 1, 4, 8, 7, 6, 5, 9],
+        [1, 2, 3],
+    ]
+
+    with ThreadPoolExecutor(1) as executor:
+        results = list(solve_scheduled(sequences, executor=executor))
+
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert [result.mutations for result in results] == [
+        solve_sequence(sequence).mutations for sequence in sequences
+    ]
+    # a single worker solves the cheap sequences before the expensive first one
+    assert results[0].queue_time >= max(result.queue_time for result in results[1:])
+    assert all(result.solve_time >= 0 for result in results)
+
+
+def test_solve_scheduled_deadline():
+    sequences = [HARD_SEQUENCE, [3, 2, 1, 4, 8, 7, 6, 5, 9]]
+
+    results = list(solve_scheduled(sequences, workers=2, deadline=0.05))
+
+    assert results[0].timed_out
+    assert results[0].solve_time < 1
+    assert len(results[1].mutations) == 2
+
+
+def test_solve_scheduled_long_sequence():
+    sequences = [LONG_SEQUENCE, [2, 1]]
+
+    results = list(solve_scheduled(sequences, workers=2, deadline=0.05))
+
+    assert results[0].timed_out
+    assert len(results[1].mutations) == 1
+
+
+def test_inversion_mutations_scheduled(tmp_path):
+    output_file = tmp_path / "output.txt"
+
+    inversion_mutations_scheduled(Path("sample_sequence_set1.txt"), output_file)
+
+    assert (
+        output_file.read_text() == Path("sample_sequence_set1_output.txt").read_text()
+    )
+
+
+def test_inversion_mutations_scheduled_timeout(tmp_path):
+    input_file = tmp_path / "input.txt"
+    output_file = tmp_path / "output.txt"
+    input_file.write_text(f"2\n{' '.join(map(str, HARD_SEQUENCE))}\n2 1\n")
+
+    inversion_mutations_scheduled(input_file, output_file, workers=2, deadline=0.05)
+
+    assert output_file.read_text().startswith(
+        f"-1\n{' '.join(map(str, HARD_SEQUENCE))}\n"
+    )
+    with pytest.raises(ValueError, match="not solved"):
+        text_to_binary_output(output_file, tmp_path / "output.bin")
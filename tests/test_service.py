@@ -0,0 +1,218 @@
+import asyncio
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import service as service_module
+from main import Mutation, MutationList, SolveTimeout, solve_sequence
+from service import (
+    SolverClient,
+    SolverService,
+    generate_load,
+    parse_address,
+    solve_batch,
+)
+
+SEQUENCES = [
+    [3, 2, 1, 4, 8, 7, 6, 5, 9],
+    [1, 2, 4, 3, 5, 8, 7, 9, 6],
+    [1, 4, 3, 2, 6, 5, 7, 10, 9, 8],
+]
+
+
+def run_service(scenario, tmp_path, **options):
+    address = f"unix:{tmp_path / 'solver.sock'}"
+
+    async def run():
+        async with (
+            SolverService(workers=2, **options) as service,
+            await service.listen(address),
+        ):
+            return await scenario(service, address)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "address, expected",
+    [
+        ("unix:/tmp/solver.sock", ("unix", "/tmp/solver.sock")),
+        ("localhost:8765", ("localhost", 8765)),
+        ("127.0.0.1:0", ("127.0.0.1", 0)),
+    ],
+)
+def test_parse_address(address, expected):
+    assert parse_address(address) == expected
+
+
+def test_parse_address_rejects_missing_port():
+    with pytest.raises(ValueError):
+        parse_address("localhost")
+
+
+def test_solve_batch():
+    solutions = solve_batch([tuple(seq) for seq in SEQUENCES], [float("inf")] * 3)
+
+    assert solutions == [solve_sequence(seq).mutations for seq in SEQUENCES]
+    assert solve_batch([(1, 3, 2, 4, 5, 6, 7, 12, 11, 10, 8, 9)], [0.0]) == [None]
+
+
+def test_service_solves_over_socket(tmp_path):
+    async def scenario(service, address):
+        async with await SolverClient.connect(address) as client:
+            return await client.solve(SEQUENCES[0])
+
+    solution = run_service(scenario, tmp_path)
+
+    assert solution == MutationList([Mutation(0, 3), Mutation(4, 4)])
+
+
+def test_service_batches_concurrent_requests(tmp_path):
+    async def scenario(service, address):
+        async with await SolverClient.connect(address) as client:
+            solutions = await asyncio.gather(
+                *(client.solve(seq) for seq in SEQUENCES * 10)
+            )
+        return solutions, service.cached
+
+    solutions, cached = run_service(scenario, tmp_path)
+
+    assert solutions == [solve_sequence(seq).mutations for seq in SEQUENCES] * 10
+    assert cached == len(SEQUENCES)
+
+
+def test_service_enforces_deadline(tmp_path):
+    async def scenario(service, address):
+        async with await SolverClient.connect(address) as client:
+            with pytest.raises(SolveTimeout):
+                await client.solve([1, 3, 2, 4, 5, 6, 7, 12, 11, 10, 8, 9], 0.01)
+            return await client.solve(SEQUENCES[1], 5.0)
+
+    solution = run_service(scenario, tmp_path)
+
+    assert len(solution) == 3
+
+
+def test_service_extends_deadline_of_duplicate_request(tmp_path):
+    sequence = [1, 4, 3, 2, 6, 5, 7, 10, 9, 8]
+
+    async def scenario(service, address):
+        async with await SolverClient.connect(address) as client:
+            return await asyncio.gather(
+                client.solve(sequence, 0.01),
+                client.solve(sequence, 600.0),
+                return_exceptions=True,
+            )
+
+    hurried, patient = run_service(scenario, tmp_path)
+
+    assert isinstance(hurried, SolveTimeout)
+    assert patient == solve_sequence(sequence).mutations
+
+
+def test_service_rejects_invalid_requests(tmp_path):
+    async def scenario(service, address):
+        reader, writer = await asyncio.open_unix_connection(parse_address(address)[1])
+        writer.write(
+            b"not json\n"
+            b'{"id": 7, "sequence": ["a"]}\n'
+            b'{"id": 8, "sequence": [2, 1], "deadline": "soon"}\n'
+            b'{"id": 9, "sequence": [5, 4, 3, 2, 1]}\n'
+        )
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in range(4)]
+        writer.close()
+        await writer.wait_closed()
+        return responses
+
+    responses = run_service(scenario, tmp_path, max_length=4)
+
+    assert [response["id"] for response in responses] == [None, 7, 8, 9]
+    assert all(response["error"].startswith("invalid") for response in responses)
+
+
+def test_service_passes_on_worker_errors(tmp_path, monkeypatch):
+    def broken_batch(sequences, deadlines):
+        raise ZeroDivisionError("broken worker")
+
+    monkeypatch.setattr(service_module, "solve_batch", broken_batch)
+
+    async def scenario(service, address):
+        with pytest.raises(ZeroDivisionError):
+            await service.solve([2, 1])
+        async with await SolverClient.connect(address) as client:
+            with pytest.raises(ValueError, match="solving failed"):
+                await client.solve([3, 2, 1])
+
+    run_service(scenario, tmp_path, executor=ThreadPoolExecutor(2))
+
+
+def test_generate_load(tmp_path):
+    async def scenario(service, address):
+        return await generate_load(address, SEQUENCES, requests=30, concurrency=4)
+
+    report = run_service(scenario, tmp_path)
+
+    assert report.requests == 30
+    assert report.timeouts == 0
+    assert report.percentile(50) <= report.percentile(99)
+
+
+def test_service_survives_long_sequence(tmp_path):
+    async def scenario(service, address):
+        async with await SolverClient.connect(address) as client:
+            with pytest.raises(SolveTimeout):
+                await client.solve(random.Random(0).sample(range(1, 301), 300), 0.05)
+            return await client.solve([2, 1], 5.0)
+
+    solution = run_service(scenario, tmp_path, max_length=300)
+
+    assert solution == MutationList([Mutation(0, 2)])
+
+
+def test_service_survives_failed_batch(tmp_path, monkeypatch):
+    split = service_module._split
+    failures = iter([ValueError("broken batch")])
+
+    def failing_split(jobs, parts):
+        for error in failures:
+            raise error
+        return split(jobs, parts)
+
+    monkeypatch.setattr(service_module, "_split", failing_split)
+
+    async def scenario(service, address):
+        async with await SolverClient.connect(address) as client:
+            with pytest.raises(ValueError):
+                await client.solve([2, 1])
+            return await client.solve([2, 1])
+
+    solution = run_service(scenario, tmp_path)
+
+    assert solution == MutationList([Mutation(0, 2)])
+
+
+@pytest.mark.parametrize("response", [b"not json\n", b'{"mutations": []}\n'])
+def test_client_fails_on_malformed_response(tmp_path, response):
+    socket_path = tmp_path / "solver.sock"
+
+    async def respond(reader, writer):
+        await reader.readline()
+        writer.write(response)
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def run():
+        async with (
+            await asyncio.start_unix_server(respond, socket_path),
+            await SolverClient.connect(f"unix:{socket_path}") as client,
+        ):
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(client.solve([2, 1]), 5)
+            with pytest.raises(ConnectionError):
+                await client.solve([2, 1])
+
+    asyncio.run(run())